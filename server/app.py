@@ -5,28 +5,105 @@ This server stores user configurations (free time budgets, whitelists, YouTube f
 The browser extension fetches config from here and does all URL blocking locally.
 """
 
+import hashlib
+import hmac
 import os
+import re
 import secrets
 import string
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from functools import wraps
 
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 import bcrypt
+import orjson
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError
+import requests as http_requests
+from requests.adapters import HTTPAdapter
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Engine, make_url
 
 # Initialize Flask app with CORS (allows browser extension to make requests)
 app = Flask(__name__)
 CORS(app)
 
+
+class OrjsonProvider(JSONProvider):
+    """
+    orjson-backed JSON provider for jsonify/request parsing. Serializes in C
+    (several times faster than stdlib json on the polling payloads) and emits
+    naive datetimes directly as Z-suffixed UTC ISO strings, so response
+    builders can pass datetime objects through without manual formatting.
+    """
+    _OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self._OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+app.json = OrjsonProvider(app)
+
 # Database location (defaults to SQLite file, can override with DATABASE_URL env var)
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///focusmunk.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Connection pool sizing so concurrent extension polls don't fight over a
+# single connection. pool_pre_ping drops stale connections (matters for
+# Postgres deployments behind a proxy; harmless for SQLite).
+engine_options = {'pool_pre_ping': True}
+_db_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+_is_sqlite = _db_url.get_backend_name() == 'sqlite'
+if _is_sqlite:
+    # Allow pooled SQLite connections to be shared across threads
+    engine_options['connect_args'] = {'check_same_thread': False}
+if not (_is_sqlite and _db_url.database in (None, ':memory:')):
+    # In-memory SQLite ("sqlite://" or "sqlite:///:memory:") uses a
+    # StaticPool that takes no sizing arguments
+    engine_options['pool_size'] = 10
+    engine_options['max_overflow'] = 20
+# orjson (C implementation) encodes/decodes the JSON columns several times
+# faster than stdlib json - whitelists can grow to hundreds of patterns
+engine_options['json_serializer'] = lambda obj: orjson.dumps(obj).decode()
+engine_options['json_deserializer'] = orjson.loads
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Enable WAL mode on every SQLite connection so readers proceed in parallel
+    with the (single) writer instead of serializing on the database lock.
+    busy_timeout makes writers wait briefly rather than failing with
+    'database is locked' under concurrent load.
+    """
+    import sqlite3
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA busy_timeout=5000')
+        cursor.close()
+
 # Setup code required to create new configurations (can override with SETUP_CODE env var)
 SETUP_CODE = os.environ.get('SETUP_CODE', 'focusmunk-setup-2024')
 
+# Day keys for the weekly free time allowance, in datetime.weekday() order
+DAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+# Shared all-zero allowance used as a fallback; treat as immutable
+_ZERO_DAYS = {day: 0 for day in DAYS}
+
 db = SQLAlchemy(app)
 
 
@@ -34,6 +111,11 @@ db = SQLAlchemy(app)
 # Database Model
 # =============================================================================
 
+# JSON column type: JSONB on Postgres (binary wire format, server-side
+# indexable), generic JSON everywhere else
+JSONType = db.JSON().with_variant(JSONB, 'postgresql')
+
+
 class Config(db.Model):
     """
     Stores a user's focusmunk configuration.
@@ -41,86 +123,243 @@ class Config(db.Model):
     """
     id = db.Column(db.String(9), primary_key=True)
     password_hash = db.Column(db.String(128), nullable=False)
-    whitelist = db.Column(db.JSON, default=list)          # URL patterns to allow
-    youtube_keywords = db.Column(db.JSON, default=list)   # Allowed video title keywords
-    youtube_creators = db.Column(db.JSON, default=list)   # Allowed YouTube channels
+    whitelist = db.Column(JSONType, default=list)          # URL patterns to allow
+    youtube_keywords = db.Column(JSONType, default=list)   # Allowed video title keywords
+    youtube_creators = db.Column(JSONType, default=list)   # Allowed YouTube channels
     disabled_until = db.Column(db.DateTime, nullable=True) # Temporary disable expiration
     
     # Budget mode free time tracking
-    daily_free_seconds = db.Column(db.JSON, default=lambda: {
-        'mon': 0, 'tue': 0, 'wed': 0, 'thu': 0, 'fri': 0, 'sat': 0, 'sun': 0
-    })
+    daily_free_seconds = db.Column(JSONType, default=lambda: dict(_ZERO_DAYS))
     free_time_used_today = db.Column(db.Integer, default=0)  # Seconds used today
     free_time_date = db.Column(db.String(10), nullable=True)  # Date string e.g. '2025-02-03'
     free_time_started_at = db.Column(db.DateTime, nullable=True)  # When current session started
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped explicitly by config-edit endpoints. Deliberately no column-level
+    # onupdate: free time counter syncs are bookkeeping, not config edits, and
+    # shouldn't rewrite the timestamp on every session end.
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Redundant with the primary key on SQLite, but makes the unique index
+    # explicit for Postgres deployments
+    __table_args__ = (db.Index('ix_config_id_unique', 'id', unique=True),)
+
+    @classmethod
+    def get_auth(cls, config_id):
+        """
+        Fetch just the password hash for a config (None if it doesn't exist).
+        Auth checks don't need the JSON columns, so this stays a one-column
+        query instead of deserializing the whole row.
+        """
+        row = db.session.query(cls.password_hash).filter_by(id=config_id).first()
+        return row[0] if row else None
 
-    def get_todays_allowance(self):
+    def get_todays_allowance(self, now=None):
         """Get the free time allowance for today in seconds"""
-        days = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
-        day = days[datetime.utcnow().weekday()]
-        return (self.daily_free_seconds or {}).get(day, 0)
+        day = DAYS[(now or datetime.utcnow()).weekday()]
+        return (self.daily_free_seconds or _ZERO_DAYS).get(day, 0)
+
+    def compute_free_time(self, now=None):
+        """
+        Compute today's free time state without touching the database:
+        - A stale date counts as a reset (the counter virtually starts at 0)
+        - An active session's elapsed time is counted virtually
+        - An exhausted budget counts as an ended session
+        Returns (used_seconds, remaining_seconds, todays_allowance, active).
+        """
+        return compute_free_time_state(self, now or datetime.utcnow())
 
-    def process_free_time(self):
+    def checkpoint_free_time(self, now=None):
         """
-        Process free time tracking on each request:
-        - Reset if new day
-        - Accumulate time if in active session
-        - Auto-end session if budget exhausted
-        Returns remaining seconds for today.
+        Fold the current free time state into the stored columns.
+        Called only from write paths (session end, disable, new-day reset) -
+        GETs stay read-only. The caller is responsible for committing.
         """
-        now = datetime.utcnow()
-        today = str(now.date())
-        
-        # Reset if new day
-        if self.free_time_date != today:
-            self.free_time_used_today = 0
-            self.free_time_date = today
-            # If session was active across midnight, restart it from now
-            if self.free_time_started_at:
-                self.free_time_started_at = now
-        
-        # If in active session, accumulate time since last sync
-        if self.free_time_started_at:
-            elapsed_seconds = int((now - self.free_time_started_at).total_seconds())
-            self.free_time_used_today += elapsed_seconds
-            self.free_time_started_at = now
-            
-            # Auto-end if budget exhausted
-            todays_allowance = self.get_todays_allowance()
-            if self.free_time_used_today >= todays_allowance:
-                self.free_time_used_today = todays_allowance  # Cap it
-                self.free_time_started_at = None  # End session
-        
-        return self.get_todays_allowance() - self.free_time_used_today
-
-    def to_dict(self):
+        now = now or datetime.utcnow()
+        used, remaining, allowance, active = compute_free_time_state(self, now)
+        self.free_time_used_today = used
+        self.free_time_date = str(now.date())
+        self.free_time_started_at = now if active else None
+
+    def to_dict(self, now=None):
         """Convert to JSON-serializable dict for API responses (excludes password)"""
-        remaining = self.process_free_time()
-        db.session.commit()  # Save any changes from process_free_time
-        
-        return {
-            'id': self.id,
-            'whitelist': self.whitelist or [],
-            'youtubeKeywords': self.youtube_keywords or [],
-            'youtubeCreators': self.youtube_creators or [],
-            'disabledUntil': (self.disabled_until.isoformat() + 'Z') if self.disabled_until else None,
-            'dailyFreeSeconds': self.daily_free_seconds or {
-                'mon': 0, 'tue': 0, 'wed': 0, 'thu': 0, 'fri': 0, 'sat': 0, 'sun': 0
-            },
-            'freeTimeUsedToday': self.free_time_used_today or 0,
-            'freeTimeStartedAt': (self.free_time_started_at.isoformat() + 'Z') if self.free_time_started_at else None,
-            'freeTimeRemaining': max(0, remaining),
-            'todaysAllowance': self.get_todays_allowance(),
-        }
+        return build_config_payload(self, now)
+
+
+# =============================================================================
+# Config Cache
+# =============================================================================
+
+# The extension polls GET /config/<id> constantly, so hitting SQLite on every
+# poll is wasteful. Read-mostly fields are cached in-process with a short TTL;
+# the database stays the source of truth and every mutating endpoint
+# invalidates the entry after committing.
+
+CONFIG_CACHE_TTL = 300  # seconds
+
+_config_cache = {}  # config_id -> (expires_at, CachedConfig)
+
+
+def prune_expired(cache):
+    """
+    Drop expired entries from a {key: (expires_at, ...)} TTL dict. Reads only
+    check expiry, so without an occasional sweep (see free_time_flusher) dead
+    entries would accumulate for the life of the process.
+    """
+    now = time.monotonic()
+    for key in [key for key, entry in cache.items() if entry[0] <= now]:
+        cache.pop(key, None)
+
+
+@dataclass
+class CachedConfig:
+    """Lightweight snapshot of a Config row, safe to hold across requests."""
+    id: str
+    password_hash: str
+    whitelist: list
+    youtube_keywords: list
+    youtube_creators: list
+    disabled_until: datetime
+    daily_free_seconds: dict
+    free_time_used_today: int
+    free_time_date: str
+    free_time_started_at: datetime
+    updated_at: datetime
+
+    def get_todays_allowance(self, now=None):
+        """Get the free time allowance for today in seconds"""
+        day = DAYS[(now or datetime.utcnow()).weekday()]
+        return (self.daily_free_seconds or _ZERO_DAYS).get(day, 0)
+
+    def to_dict(self, now=None):
+        """Same shape as Config.to_dict() (free time state computed virtually)"""
+        return build_config_payload(self, now)
+
+
+def cache_config(cfg):
+    """Store a snapshot of a Config row in the cache and return it"""
+    cached = CachedConfig(
+        id=cfg.id,
+        password_hash=cfg.password_hash,
+        whitelist=cfg.whitelist,
+        youtube_keywords=cfg.youtube_keywords,
+        youtube_creators=cfg.youtube_creators,
+        disabled_until=cfg.disabled_until,
+        daily_free_seconds=cfg.daily_free_seconds,
+        free_time_used_today=cfg.free_time_used_today,
+        free_time_date=cfg.free_time_date,
+        free_time_started_at=cfg.free_time_started_at,
+        updated_at=cfg.updated_at,
+    )
+    _config_cache[cfg.id] = (time.monotonic() + CONFIG_CACHE_TTL, cached)
+    return cached
+
+
+def get_cached_config(config_id):
+    """
+    Fetch a config snapshot, preferring the cache over the database.
+    Returns None if the config doesn't exist (misses are not cached).
+    """
+    entry = _config_cache.get(config_id)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    cfg = Config.query.get(config_id)
+    if not cfg:
+        return None
+    return cache_config(cfg)
+
+
+def invalidate_config_cache(config_id):
+    """Drop a config from the cache (call after any mutation is committed)"""
+    _config_cache.pop(config_id, None)
 
 
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
+def compute_free_time_state(cfg, now):
+    """
+    Shared free time math for Config rows and CachedConfig snapshots.
+    Pure function of the stored fields and `now` - no side effects, so the
+    read path can call it on every poll without taking SQLite's write lock.
+    Returns (used_seconds, remaining_seconds, todays_allowance, active).
+    """
+    allowance = cfg.get_todays_allowance(now)
+    used = cfg.free_time_used_today or 0
+    started_at = cfg.free_time_started_at
+
+    # Stale date means a new day: the counter virtually resets to 0. If a
+    # session ran across midnight, only the time since midnight counts today.
+    if cfg.free_time_date != str(now.date()):
+        used = 0
+        if started_at:
+            midnight = datetime.combine(now.date(), datetime.min.time())
+            started_at = max(started_at, midnight)
+
+    active = started_at is not None
+    if started_at:
+        used += int((now - started_at).total_seconds())
+        # Budget exhausted: cap and treat the session as ended
+        if used >= allowance:
+            used = allowance
+            active = False
+
+    return used, max(0, allowance - used), allowance, active
+
+
+def build_config_payload(cfg, now=None):
+    """Build the API response dict for a Config row or CachedConfig snapshot"""
+    now = now or datetime.utcnow()
+    used, remaining, allowance, active = compute_free_time_state(cfg, now)
+    return {
+        'id': cfg.id,
+        'whitelist': cfg.whitelist or [],
+        'youtubeKeywords': cfg.youtube_keywords or [],
+        'youtubeCreators': cfg.youtube_creators or [],
+        'disabledUntil': cfg.disabled_until,
+        'dailyFreeSeconds': cfg.daily_free_seconds or _ZERO_DAYS,
+        'freeTimeUsedToday': used,
+        'freeTimeStartedAt': now if active else None,
+        'freeTimeRemaining': remaining,
+        'todaysAllowance': allowance,
+    }
+
+
+def persist_free_time(config_id, used, date, started_at):
+    """
+    Persist the free time counters with a single targeted UPDATE.
+    Skips the ORM unit-of-work flush and leaves updated_at untouched, so the
+    hot session-end write stays a minimal three-column statement.
+    """
+    db.session.execute(
+        db.update(Config)
+        .where(Config.id == config_id)
+        .values(
+            free_time_used_today=used,
+            free_time_date=date,
+            free_time_started_at=started_at,
+        )
+        .execution_options(synchronize_session=False))
+    db.session.commit()
+
+
+def config_etag(cfg, now):
+    """
+    Cheap fingerprint of the state that determines a /config response: the
+    config-edit timestamp, the free time counters, and the current date -
+    todaysAllowance and the virtual counter reset depend on the day, so two
+    identical counters on different days must not share a validator. Lets
+    unchanged polls short-circuit to a 304 with no JSON serialization.
+    """
+    raw = '{}:{}:{}:{}'.format(
+        now.date(),
+        cfg.updated_at.timestamp() if cfg.updated_at else 0,
+        cfg.free_time_used_today,
+        cfg.free_time_started_at)
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=8).hexdigest()
+
+
 def generate_config_id():
     """Generate a random config ID like 'WXYZ-1234' (4 letters + 4 numbers)"""
     letters = ''.join(secrets.choice(string.ascii_uppercase) for _ in range(4))
@@ -128,34 +367,126 @@ def generate_config_id():
     return f"{letters}-{numbers}"
 
 
+# Argon2id at the OWASP baseline: memory-hard, so GPU/FPGA cracking rigs pay
+# far more per guess than they do against bcrypt, while a legitimate verify
+# stays under ~50ms. Existing bcrypt hashes keep working and are transparently
+# rehashed on the next successful login (see upgrade_legacy_hash).
+PASSWORD_HASHER = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
+
 def hash_password(password):
-    """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    """Hash a password using Argon2id"""
+    return PASSWORD_HASHER.hash(password)
 
 
 def verify_password(password, password_hash):
-    """Verify a password against its bcrypt hash"""
+    """Verify a password against its stored hash (Argon2id, or legacy bcrypt)"""
+    if password_hash.startswith('$argon2'):
+        try:
+            PASSWORD_HASHER.verify(password_hash, password)
+            return True
+        except VerificationError:
+            return False
     return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
 
 
+def upgrade_legacy_hash(config_id, password, password_hash):
+    """
+    Rehash a legacy bcrypt password with Argon2id after a successful
+    verification, so old configs migrate transparently on their next login.
+    """
+    if not password_hash.startswith('$2'):
+        return
+    db.session.execute(
+        db.update(Config)
+        .where(Config.id == config_id)
+        .values(password_hash=hash_password(password))
+        .execution_options(synchronize_session=False))
+    db.session.commit()
+    invalidate_config_cache(config_id)
+
+
+# Used to equalize response timing when a config ID doesn't exist: auth paths
+# verify against this throwaway hash instead of returning early, so an
+# attacker can't tell valid IDs from invalid ones by timing the responses.
+DUMMY_HASH = PASSWORD_HASHER.hash('x')
+
+
+def burn_dummy_verify():
+    """Spend one password verification's worth of time (see DUMMY_HASH)"""
+    verify_password('x', DUMMY_HASH)
+
+
+def check_setup_code(data):
+    """Constant-time comparison of a request's setupCode against SETUP_CODE"""
+    # Compare as bytes: compare_digest raises TypeError on non-ASCII str
+    submitted = str(data.get('setupCode') or '').encode('utf-8')
+    return hmac.compare_digest(submitted, SETUP_CODE.encode('utf-8'))
+
+
+# A password verification costs tens of milliseconds of CPU, which is the
+# right price for a login but wasteful when the settings page fires several
+# authenticated writes in a row. Successful verifications are remembered for a few minutes, keyed
+# by an HMAC of (config_id, password) under a per-process secret so the cache
+# never stores the password itself. Failures are never cached, so brute-force
+# attempts still pay full bcrypt cost.
+
+AUTH_CACHE_TTL = 300  # seconds
+
+_auth_cache = {}  # hmac token -> (expires_at, config_id)
+_auth_cache_secret = secrets.token_bytes(32)
+
+
+def _auth_cache_token(config_id, password):
+    return hmac.new(_auth_cache_secret, f"{config_id}:{password}".encode('utf-8'),
+                    'sha256').hexdigest()
+
+
+def check_auth_cache(config_id, password):
+    """True if this (config_id, password) pair verified successfully recently"""
+    entry = _auth_cache.get(_auth_cache_token(config_id, password))
+    return bool(entry and entry[0] > time.monotonic())
+
+
+def remember_auth(config_id, password):
+    """Record a successful password verification for AUTH_CACHE_TTL seconds"""
+    _auth_cache[_auth_cache_token(config_id, password)] = (
+        time.monotonic() + AUTH_CACHE_TTL, config_id)
+
+
+def invalidate_auth_cache(config_id):
+    """Drop all remembered verifications for a config (call on password change)"""
+    for token in [t for t, (_, cid) in _auth_cache.items() if cid == config_id]:
+        _auth_cache.pop(token, None)
+
+
 def require_password(f):
     """
     Decorator for routes that require password authentication.
-    Looks up the config, verifies the password, and passes the config to the route.
+    Verifies the password against a one-column hash lookup, then loads the
+    full config row only once authentication succeeds - failed attempts never
+    pay for deserializing the JSON columns.
+    Leaves the parsed request body in g.body and the authenticated row in
+    g.config so views don't re-parse or re-fetch.
     Returns 401 if password is missing or invalid.
     """
     @wraps(f)
     def decorated(config_id, *args, **kwargs):
-        cfg = Config.query.get(config_id)
-        if not cfg:
+        password_hash = Config.get_auth(config_id)
+        if not password_hash:
+            burn_dummy_verify()
             return jsonify({'error': 'Configuration not found'}), 404
-        data = request.get_json() or {}
-        pwd = data.get('password')
+        g.body = request.get_json(cache=True, silent=True) or {}
+        pwd = g.body.get('password')
         if not pwd:
             return jsonify({'error': 'Password required'}), 401
-        if not verify_password(pwd, cfg.password_hash):
-            return jsonify({'error': 'Invalid password'}), 401
-        return f(config_id, config=cfg, *args, **kwargs)
+        if not check_auth_cache(config_id, pwd):
+            if not verify_password(pwd, password_hash):
+                return jsonify({'error': 'Invalid password'}), 401
+            remember_auth(config_id, pwd)
+            upgrade_legacy_hash(config_id, pwd, password_hash)
+        g.config = Config.query.get(config_id)
+        return f(config_id, *args, **kwargs)
     return decorated
 
 
@@ -163,6 +494,16 @@ def require_password(f):
 # API Routes
 # =============================================================================
 
+@app.before_request
+def stamp_request_time():
+    """
+    Capture "now" once per request. Endpoints and the free time math read
+    g.now instead of each calling datetime.utcnow(), so a single request sees
+    one consistent timestamp (and tests can freeze it in one place).
+    """
+    g.now = datetime.utcnow()
+
+
 @app.route('/config', methods=['POST'])
 def create_config():
     """
@@ -170,7 +511,7 @@ def create_config():
     Requires setup code and password. Returns the generated config ID.
     """
     data = request.get_json() or {}
-    if data.get('setupCode') != SETUP_CODE:
+    if not check_setup_code(data):
         return jsonify({'error': 'Invalid setup code'}), 401
     password = data.get('password')
     if not password or len(password) < 4:
@@ -182,12 +523,10 @@ def create_config():
         config_id = generate_config_id()
     
     # Convert daily free minutes to seconds
-    daily_free_seconds = {}
     daily_free_minutes = data.get('dailyFreeMinutes', {})
-    for day in ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']:
-        minutes = daily_free_minutes.get(day, 0)
-        daily_free_seconds[day] = int(minutes) * 60
-    
+    daily_free_seconds = {day: int(daily_free_minutes.get(day, 0)) * 60 for day in DAYS}
+
+
     cfg = Config(
         id=config_id,
         password_hash=hash_password(password),
@@ -206,22 +545,48 @@ def get_config(config_id):
     """
     Fetch a configuration by ID.
     No password required - config data isn't secret, only modification is protected.
-    This also processes free time tracking (accumulates time, resets on new day).
+    Free time state is computed virtually, so this is a pure read: no database
+    writes. The only exception is a lazy once-per-day write to persist the
+    new-day counter reset.
     """
-    cfg = Config.query.get(config_id)
-    if not cfg:
+    cached = get_cached_config(config_id)
+    if not cached:
         return jsonify({'error': 'Configuration not found'}), 404
-    return jsonify(cfg.to_dict())
+
+    now = g.now
+    today = str(now.date())
+    if cached.free_time_date and cached.free_time_date != today:
+        # The date rolled over since the last write. The response below
+        # already computes the reset virtually; persisting it is handed to
+        # the background flusher so the read path stays write-free.
+        _dirty_free_time.add(config_id)
+
+    # Conditional requests only apply while no session is active: a running
+    # session changes the body continuously without touching the fingerprinted
+    # columns, so a 304 would freeze the countdown. Day rollovers are covered
+    # by the date inside the fingerprint itself.
+    etag = config_etag(cached, now) if not cached.free_time_started_at else None
+
+    # Unchanged since the extension's last poll: skip the body entirely
+    if etag and request.headers.get('If-None-Match') == etag:
+        return '', 304, {'ETag': etag}
+
+    response = jsonify(cached.to_dict(now))
+    if etag:
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = 'private, max-age=5'
+    return response
 
 
 @app.route('/config/<config_id>', methods=['PUT'])
 @require_password
-def update_config(config_id, config=None):
+def update_config(config_id):
     """
     Update a configuration (whitelist, daily free time, YouTube filters).
     Requires password.
     """
-    data = request.get_json() or {}
+    data = g.body
+    config = g.config
     if 'whitelist' in data:
         config.whitelist = data['whitelist']
     if 'youtubeKeywords' in data:
@@ -230,13 +595,13 @@ def update_config(config_id, config=None):
         config.youtube_creators = data['youtubeCreators']
     if 'dailyFreeMinutes' in data:
         # Convert minutes to seconds
-        daily_free_seconds = {}
-        for day in ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']:
-            minutes = data['dailyFreeMinutes'].get(day, 0)
-            daily_free_seconds[day] = int(minutes) * 60
-        config.daily_free_seconds = daily_free_seconds
+        daily_free_minutes = data['dailyFreeMinutes']
+        config.daily_free_seconds = {
+            day: int(daily_free_minutes.get(day, 0)) * 60 for day in DAYS}
+    config.updated_at = g.now
     db.session.commit()
-    return jsonify(config.to_dict())
+    invalidate_config_cache(config_id)
+    return jsonify(config.to_dict(g.now))
 
 
 @app.route('/config/<config_id>/verify', methods=['POST'])
@@ -245,29 +610,36 @@ def verify_config_password(config_id):
     Check if a password is correct.
     Used by the settings page to verify login.
     """
-    cfg = Config.query.get(config_id)
-    if not cfg:
+    password_hash = Config.get_auth(config_id)
+    if not password_hash:
+        burn_dummy_verify()
         return jsonify({'error': 'Configuration not found'}), 404
     data = request.get_json() or {}
     pwd = data.get('password')
     if not pwd:
         return jsonify({'valid': False})
-    return jsonify({'valid': verify_password(pwd, cfg.password_hash)})
+    valid = verify_password(pwd, password_hash)
+    if valid:
+        upgrade_legacy_hash(config_id, pwd, password_hash)
+    return jsonify({'valid': valid})
 
 
 @app.route('/config/<config_id>/change-password', methods=['POST'])
 @require_password
-def change_password(config_id, config=None):
+def change_password(config_id):
     """
     Change the configuration password.
     Requires current password.
     """
-    data = request.get_json() or {}
-    new_pwd = data.get('newPassword')
+    config = g.config
+    new_pwd = g.body.get('newPassword')
     if not new_pwd or len(new_pwd) < 4:
         return jsonify({'error': 'New password must be at least 4 characters'}), 400
     config.password_hash = hash_password(new_pwd)
+    config.updated_at = g.now
     db.session.commit()
+    invalidate_config_cache(config_id)
+    invalidate_auth_cache(config_id)
     return jsonify({'success': True})
 
 
@@ -280,9 +652,10 @@ def start_free_time(config_id):
     """
     cfg = Config.query.get(config_id)
     if not cfg:
+        burn_dummy_verify()
         return jsonify({'error': 'Configuration not found'}), 404
-    
-    now = datetime.utcnow()
+
+    now = g.now
     today = str(now.date())
     
     # Reset if new day
@@ -295,18 +668,20 @@ def start_free_time(config_id):
         return jsonify({'error': 'Already in free time session'}), 400
     
     # Check if budget available
-    remaining = cfg.get_todays_allowance() - cfg.free_time_used_today
+    allowance = cfg.get_todays_allowance(now)
+    remaining = allowance - cfg.free_time_used_today
     if remaining <= 0:
         return jsonify({'error': 'No free time remaining today'}), 400
-    
+
     # Start session
     cfg.free_time_started_at = now
     db.session.commit()
-    
+    invalidate_config_cache(config_id)
+
     return jsonify({
         'success': True,
         'freeTimeRemaining': remaining,
-        'todaysAllowance': cfg.get_todays_allowance()
+        'todaysAllowance': allowance
     })
 
 
@@ -320,53 +695,46 @@ def end_free_time(config_id):
     if not cfg:
         return jsonify({'error': 'Configuration not found'}), 404
     
-    now = datetime.utcnow()
-    
+    now = g.now
+
+    used, remaining, allowance, _ = cfg.compute_free_time(now)
     if cfg.free_time_started_at:
-        # Accumulate final elapsed time
-        elapsed_seconds = int((now - cfg.free_time_started_at).total_seconds())
-        cfg.free_time_used_today += elapsed_seconds
-        
-        # Cap at today's allowance
-        todays_allowance = cfg.get_todays_allowance()
-        if cfg.free_time_used_today > todays_allowance:
-            cfg.free_time_used_today = todays_allowance
-        
-        cfg.free_time_started_at = None
-        db.session.commit()
-    
-    remaining = cfg.get_todays_allowance() - cfg.free_time_used_today
+        # Fold the session's elapsed time into the stored counter and end it
+        persist_free_time(config_id, used=used, date=str(now.date()), started_at=None)
+        invalidate_config_cache(config_id)
+
     return jsonify({
         'success': True,
-        'freeTimeRemaining': max(0, remaining),
-        'todaysAllowance': cfg.get_todays_allowance()
+        'freeTimeRemaining': remaining,
+        'todaysAllowance': allowance
     })
 
 
 @app.route('/config/<config_id>/temporary-disable', methods=['POST'])
 @require_password
-def temporary_disable(config_id, config=None):
+def temporary_disable(config_id):
     """
     Temporarily disable blocking for a number of hours.
     Requires password.
     If in a free time session, ends it first (preserves used time).
     """
-    data = request.get_json() or {}
-    hours = data.get('hours')
+    config = g.config
+    hours = g.body.get('hours')
     if hours is None or float(hours) <= 0:
         return jsonify({'error': 'Hours must be positive'}), 400
-    
-    now = datetime.utcnow()
+
+    now = g.now
     
     # If in free time session, end it first
     if config.free_time_started_at:
-        elapsed_seconds = int((now - config.free_time_started_at).total_seconds())
-        config.free_time_used_today += elapsed_seconds
+        config.checkpoint_free_time(now)
         config.free_time_started_at = None
-    
+
     config.disabled_until = now + timedelta(hours=float(hours))
+    config.updated_at = now
     db.session.commit()
-    return jsonify({'success': True, 'disabledUntil': config.disabled_until.isoformat() + 'Z'})
+    invalidate_config_cache(config_id)
+    return jsonify({'success': True, 'disabledUntil': config.disabled_until})
 
 
 @app.route('/config/<config_id>/cancel-disable', methods=['POST'])
@@ -379,10 +747,28 @@ def cancel_disable(config_id):
     if not config:
         return jsonify({'error': 'Config not found'}), 404
     config.disabled_until = None
+    config.updated_at = g.now
     db.session.commit()
+    invalidate_config_cache(config_id)
     return jsonify({'success': True})
 
 
+# Matches the canonical 11-character video ID in watch, short-link, embed,
+# and Shorts URLs. Anchoring v= to a ?/& delimiter avoids false matches on
+# parameters that merely end in "v" (e.g. cv=...).
+_VIDEO_ID_RE = re.compile(r'(?:[?&]v=|youtu\.be/|/embed/|/shorts/)([A-Za-z0-9_-]{11})')
+
+# One pooled session for all YouTube Data API calls, so repeat fetches reuse
+# TCP+TLS connections instead of handshaking with googleapis.com every time
+YOUTUBE_SESSION = http_requests.Session()
+YOUTUBE_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Video titles/channels are effectively immutable, so cache them for a day
+YOUTUBE_CACHE_TTL = 86400  # seconds
+
+_youtube_cache = {}  # video_id -> (expires_at, info dict)
+
+
 @app.route('/youtube-info', methods=['GET'])
 def youtube_info():
     """
@@ -396,7 +782,7 @@ def youtube_info():
     # Validate configId
     if not config_id:
         return jsonify({'error': 'configId required'}), 400
-    cfg = Config.query.get(config_id)
+    cfg = get_cached_config(config_id)
     if not cfg:
         return jsonify({'error': 'Invalid configId'}), 401
     
@@ -405,41 +791,42 @@ def youtube_info():
         return jsonify({'error': 'url required'}), 400
     
     # Extract video ID from URL
-    video_id = None
-    if 'v=' in url:
-        video_id = url.split('v=')[1].split('&')[0]
-    elif 'youtu.be/' in url:
-        video_id = url.split('youtu.be/')[1].split('?')[0]
-    
-    if not video_id:
+    match = _VIDEO_ID_RE.search(url)
+    if not match:
         return jsonify({'error': 'Could not parse video ID from URL'}), 400
-    
+    video_id = match.group(1)
+
+    # Serve from cache if we've looked this video up recently
+    entry = _youtube_cache.get(video_id)
+    if entry and entry[0] > time.monotonic():
+        return jsonify(entry[1])
+
     # Get YouTube API key from environment
     api_key = os.environ.get('YOUTUBE_API_KEY')
     if not api_key:
         return jsonify({'error': 'YouTube API not configured'}), 500
-    
+
     # Call YouTube Data API v3
     try:
-        import urllib.request
-        import json as json_lib
-        
-        api_url = f'https://www.googleapis.com/youtube/v3/videos?id={video_id}&key={api_key}&part=snippet'
-        req = urllib.request.Request(api_url)
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json_lib.loads(response.read().decode('utf-8'))
-        
+        response = YOUTUBE_SESSION.get(
+            'https://www.googleapis.com/youtube/v3/videos',
+            params={'id': video_id, 'key': api_key, 'part': 'snippet'},
+            timeout=10)
+        if response.status_code != 200:
+            return jsonify({'error': f'YouTube API error: {response.status_code}'}), 502
+        data = response.json()
+
         if not data.get('items') or len(data['items']) == 0:
             return jsonify({'error': 'Video not found'}), 404
-        
+
         snippet = data['items'][0]['snippet']
-        return jsonify({
+        info = {
             'title': snippet.get('title'),
             'authorName': snippet.get('channelTitle'),
             'authorUrl': f"https://www.youtube.com/channel/{snippet.get('channelId')}"
-        })
-    except urllib.request.HTTPError as e:
-        return jsonify({'error': f'YouTube API error: {e.code}'}), 502
+        }
+        _youtube_cache[video_id] = (time.monotonic() + YOUTUBE_CACHE_TTL, info)
+        return jsonify(info)
     except Exception as e:
         return jsonify({'error': f'Failed to fetch video info: {str(e)}'}), 500
 
@@ -451,7 +838,7 @@ def verify_setup_code():
     Used during initial extension setup.
     """
     data = request.get_json() or {}
-    return jsonify({'valid': data.get('setupCode') == SETUP_CODE})
+    return jsonify({'valid': check_setup_code(data)})
 
 
 @app.route('/health', methods=['GET'])
@@ -464,10 +851,52 @@ def health():
 # Startup
 # =============================================================================
 
+# Config IDs whose free time bookkeeping (e.g. the new-day counter reset) is
+# pending persistence. Reads serve the computed state immediately and leave
+# the write here for the background flusher, keeping GETs free of commits.
+_dirty_free_time = set()
+
+FREE_TIME_FLUSH_INTERVAL = 30  # seconds
+
+
+def free_time_flusher():
+    """
+    Periodically persist deferred free time bookkeeping and sweep expired
+    entries out of the TTL caches. Losing a cycle (e.g. on shutdown) is
+    harmless: the pending state is recomputed from the stored columns on the
+    next read and simply flushed later.
+    """
+    while True:
+        time.sleep(FREE_TIME_FLUSH_INTERVAL)
+        prune_expired(_config_cache)
+        prune_expired(_auth_cache)
+        prune_expired(_youtube_cache)
+        if not _dirty_free_time:
+            continue
+        dirty = list(_dirty_free_time)
+        _dirty_free_time.difference_update(dirty)
+        try:
+            with app.app_context():
+                for config_id in dirty:
+                    cfg = Config.query.get(config_id)
+                    if cfg:
+                        cfg.checkpoint_free_time()
+                db.session.commit()
+            for config_id in dirty:
+                invalidate_config_cache(config_id)
+        except Exception:
+            app.logger.exception('free time flush failed; will retry')
+            _dirty_free_time.update(dirty)
+
+
 # Create database tables if they don't exist
 with app.app_context():
     db.create_all()
 
+# Daemon thread so it never blocks shutdown; under gevent (see wsgi.py) the
+# monkey-patched thread runs as a greenlet
+threading.Thread(target=free_time_flusher, daemon=True).start()
+
 # Run development server if executed directly
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,29 @@
+"""
+WSGI entry point for running under gunicorn with gevent workers.
+
+The dev server (python app.py) is single-threaded, so one slow upstream call
+(e.g. the YouTube Data API fetch in /youtube-info) stalls every other request.
+gevent workers turn blocking socket I/O into cooperative yields, letting one
+worker serve many concurrent extension polls alongside slow fetches.
+
+Run with:
+
+    gunicorn -k gevent -w 1 --worker-connections 100 wsgi:app
+
+Keep it at one worker: the config/auth caches and the deferred free time
+bookkeeping are per-process, and their invalidation doesn't cross process
+boundaries - a second worker would serve stale snapshots after a mutation
+lands on the first. A single gevent worker already multiplexes far more
+concurrent requests than this server sees.
+
+Note: monkey.patch_all() must run before anything else imports socket/ssl,
+so the two lines below have to stay first.
+"""
+
+from gevent import monkey
+monkey.patch_all()
+
+from app import app  # noqa: E402
+
+if __name__ == '__main__':
+    app.run(port=5000)